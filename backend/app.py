@@ -1,4 +1,5 @@
 import os
+import threading
 from flask import Flask
 from config import Config
 from src.extensions import init_extensions
@@ -60,14 +61,23 @@ def create_app(config_class=Config):
             }
         }, 200
 
-    # ✅ PRELOAD MODEL WITH APP CONTEXT
-    with app.app_context():
-        try:
-            print("🚀 Preloading HuggingFace summarizer model...")
-            from src.services.summarizer_service import _get_summarizer
-            _get_summarizer()
-        except Exception as e:
-            print(f"⚠️ Failed to preload summarizer: {e}")
+    # Background writer for citation rows deferred off the upload request path
+    from src.services.persist_service import start_persist_worker
+    start_persist_worker(app)
+
+    # ✅ PRELOAD MODEL WITH APP CONTEXT (in the background so startup is not blocked;
+    # requests arriving meanwhile wait on the same build instead of loading twice)
+    def _preload_summarizer():
+        with app.app_context():
+            try:
+                print("🚀 Preloading HuggingFace summarizer model...")
+                from src.services.summarizer_service import _get_summarizer
+                _get_summarizer()
+            except Exception as e:
+                print(f"⚠️ Failed to preload summarizer: {e}")
+
+    if app.config.get('USE_HF_SUMMARIZER', True):
+        threading.Thread(target=_preload_summarizer, name="summarizer-preload", daemon=True).start()
 
     return app
 
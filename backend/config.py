@@ -31,6 +31,9 @@ class Config:
     # HuggingFace settings
     HF_MODEL_NAME = os.environ.get('HF_MODEL_NAME', 'facebook/bart-large-cnn')
     HF_CACHE_DIR = os.environ.get('HF_CACHE_DIR', './models_cache')
+    HF_DEVICE = int(os.environ.get('HF_DEVICE', -1))  # -1 for CPU, 0 for GPU
+    HF_QUANTIZE_INT8 = os.environ.get('HF_QUANTIZE_INT8', 'true').lower() == 'true'  # CPU only
+    HF_BATCH_SIZE = int(os.environ.get('HF_BATCH_SIZE', 4))  # lower on small-RAM hosts
     
     # Feature flags
     USE_HF_SUMMARIZER = os.environ.get('USE_HF_SUMMARIZER', 'true').lower() == 'true'
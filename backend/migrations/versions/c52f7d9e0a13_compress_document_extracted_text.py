@@ -0,0 +1,68 @@
+"""Store document extracted text zlib-compressed
+
+Revision ID: c52f7d9e0a13
+Revises: 8d41c0e7b2a9
+Create Date: 2026-10-15 14:03:57.220164
+
+"""
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c52f7d9e0a13'
+down_revision = '8d41c0e7b2a9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('extracted_text_zlib', sa.LargeBinary(), nullable=True))
+
+    documents = sa.table(
+        'documents',
+        sa.column('id', sa.Integer),
+        sa.column('extracted_text', sa.Text),
+        sa.column('extracted_text_zlib', sa.LargeBinary),
+    )
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(documents.c.id, documents.c.extracted_text).where(documents.c.extracted_text.isnot(None))
+    ).fetchall()
+    for doc_id, text in rows:
+        bind.execute(
+            documents.update()
+            .where(documents.c.id == doc_id)
+            .values(extracted_text_zlib=zlib.compress(text.encode('utf-8'), 3))
+        )
+
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.drop_column('extracted_text')
+
+
+def downgrade():
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('extracted_text', sa.Text(), nullable=True))
+
+    documents = sa.table(
+        'documents',
+        sa.column('id', sa.Integer),
+        sa.column('extracted_text', sa.Text),
+        sa.column('extracted_text_zlib', sa.LargeBinary),
+    )
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(documents.c.id, documents.c.extracted_text_zlib).where(documents.c.extracted_text_zlib.isnot(None))
+    ).fetchall()
+    for doc_id, blob in rows:
+        bind.execute(
+            documents.update()
+            .where(documents.c.id == doc_id)
+            .values(extracted_text=zlib.decompress(blob).decode('utf-8'))
+        )
+
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.drop_column('extracted_text_zlib')
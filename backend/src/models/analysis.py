@@ -12,6 +12,7 @@ class Analysis(db.Model):
     plagiarism_details_json = db.Column(db.Text)  # JSON string for matching sources
     fact_check_results_json = db.Column(db.Text)  # JSON string for fact-check results
     critique_json = db.Column(db.Text)  # JSON string
+    status = db.Column(db.String(20))  # pending_persist until deferred citation writes finish, then complete (or partial if a service fell back)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -81,6 +82,7 @@ class Analysis(db.Model):
             'plagiarism_details': self.plagiarism_details,
             'fact_check_results': self.fact_check_results,
             'critique': self.critique,
+            'status': self.status,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'citations': [citation.to_dict() for citation in self.citations]
         }
@@ -1,4 +1,5 @@
 from datetime import datetime
+import zlib
 from src.extensions import db
 
 class Document(db.Model):
@@ -9,13 +10,29 @@ class Document(db.Model):
     filename = db.Column(db.String(255), nullable=False)
     stored_path = db.Column(db.String(500), nullable=False)
     title = db.Column(db.String(500))
-    extracted_text = db.Column(db.Text)  # Store extracted PDF text
+    extracted_text_zlib = db.Column(db.LargeBinary)  # zlib-compressed extracted PDF text
     word_count = db.Column(db.Integer)
+    content_sha256 = db.Column(db.String(64), index=True)  # SHA-256 of the uploaded PDF bytes
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationships
     analysis = db.relationship('Analysis', backref='document', uselist=False, cascade='all, delete-orphan')
     
+    @property
+    def extracted_text(self):
+        """Get extracted text, decompressed on access."""
+        if self.extracted_text_zlib:
+            return zlib.decompress(self.extracted_text_zlib).decode('utf-8')
+        return None
+    
+    @extracted_text.setter
+    def extracted_text(self, value):
+        """Store extracted text compressed (~5x smaller rows and WAL)."""
+        if value:
+            self.extracted_text_zlib = zlib.compress(value.encode('utf-8'), 3)
+        else:
+            self.extracted_text_zlib = None
+    
     def to_dict(self, include_text=False):
         """Convert document to dictionary."""
         data = {
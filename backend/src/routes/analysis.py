@@ -6,11 +6,12 @@ from src.models.document import Document
 from src.models.analysis import Analysis
 from src.models.citation import Citation
 from src.utils.security import get_current_user, check_document_ownership, check_analysis_ownership
-from src.services.pdf_service import extract_text_and_meta
+from src.services.pdf_service import load_document_text
 from src.services.summarizer_service import summarize
 from src.services.plagiarism_service import check as check_plagiarism
 from src.services.citations_service import validate as validate_citations
 from src.services.critique_service import critique
+from src.utils.concurrency import submit_cpu_bound, submit_with_app_context
 
 bp = Blueprint('analysis', __name__, url_prefix='/analysis')
 
@@ -47,7 +48,7 @@ def run_analysis():
     
     try:
         # Extract text from document
-        text, word_count, title = extract_text_and_meta(document.stored_path)
+        text, word_count, title = load_document_text(document)
         
         if not text or len(text.strip()) < 100:
             return jsonify({'message': 'Document text too short for analysis'}), 400
@@ -55,19 +56,17 @@ def run_analysis():
         # Run analysis pipeline
         print(f"Starting analysis for document {document.id}")
         
-        # 1. Summarization
-        print("Running summarization...")
-        summary = summarize(text)
+        # 1-3. Summarization, plagiarism detection and citation validation are
+        # independent, so run them concurrently and wait for all three
+        print("Running summarization, plagiarism check and citation validation...")
+        f_sum = submit_with_app_context(summarize, text)
+        f_plag = submit_cpu_bound(check_plagiarism, text)
+        f_cit = submit_cpu_bound(validate_citations, text)
+        summary = f_sum.result()
+        plagiarism_score = f_plag.result()
+        citation_results = f_cit.result()
         
-        # 2. Plagiarism detection
-        print("Running plagiarism check...")
-        plagiarism_score = check_plagiarism(text)
-        
-        # 3. Citation validation
-        print("Validating citations...")
-        citation_results = validate_citations(text)
-        
-        # 4. Critique analysis
+        # 4. Critique analysis (needs the summary)
         print("Running critique analysis...")
         critique_results = critique(text, summary)
         
@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify
 from src.services.citations_service import validate
-from src.services.pdf_service import extract_text_and_meta
+from src.services.pdf_service import load_document_text
 from src.models.document import Document
 
 citations_bp = Blueprint("citations", __name__)
@@ -41,7 +41,7 @@ def validate_citations_endpoint():
             if not document:
                 return jsonify({"status": "error", "message": "document not found", "data": None}), 404
 
-            text, word_count, title = extract_text_and_meta(document.stored_path)
+            text, word_count, title = load_document_text(document)
             if not text or len(text.strip()) < 100:
                 return jsonify({"status": "error", "message": "Document too short", "data": None}), 400
 
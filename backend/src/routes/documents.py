@@ -6,7 +6,8 @@ from src.models.user import User
 from src.models.document import Document
 from src.utils.validators import validate_upload_request, generate_safe_filename
 from src.utils.security import get_current_user, check_document_ownership
-from src.services.pdf_service import extract_text_and_meta
+from src.services.pdf_service import extract_text_and_meta_cached, remove_cached_text
+from src.utils.cache import copy_and_sha256
 
 bp = Blueprint('documents', __name__, url_prefix='/documents')
 
@@ -34,18 +35,23 @@ def upload_document():
         os.makedirs(upload_dir, exist_ok=True)
         
         file_path = os.path.join(upload_dir, safe_filename)
-        file.save(file_path)
+        # hash while saving so later routes can reuse the extraction by content
+        with open(file_path, 'wb') as out:
+            content_sha256 = copy_and_sha256(file.stream, out)
         
         # Extract text and metadata
-        text, word_count, title = extract_text_and_meta(file_path)
+        text, word_count, title = extract_text_and_meta_cached(file_path, content_sha256)
         
-        # Create document record
+        # Create document record; the text is stored so analysis/fact-check/citation
+        # runs on this document never re-parse the PDF
         document = Document(
             user_id=current_user.id,
             filename=file.filename,
             stored_path=file_path,
             title=title,
-            word_count=word_count
+            word_count=word_count,
+            extracted_text=text,
+            content_sha256=content_sha256,
         )
         
         db.session.add(document)
@@ -139,9 +145,14 @@ def delete_document(document_id):
             os.remove(document.stored_path)
         
         # Delete from database (cascade will handle analysis and citations)
+        content_sha256 = document.content_sha256
         db.session.delete(document)
         db.session.commit()
         
+        # Cached text is keyed by content, so keep it while another document shares it
+        if content_sha256 and not Document.query.filter_by(content_sha256=content_sha256).first():
+            remove_cached_text(content_sha256)
+        
         return jsonify({'message': 'Document deleted successfully'}), 200
         
     except Exception as e:
@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify
 from src.services.factcheck_service import extract_claims, fact_check_claims
-from src.services.pdf_service import extract_text_and_meta
+from src.services.pdf_service import load_document_text
 from src.models.document import Document
 
 factcheck_bp = Blueprint("factcheck", __name__)
@@ -60,7 +60,7 @@ def run_factcheck():
             
             try:
                 # Extract text from stored PDF file
-                text, word_count, title = extract_text_and_meta(document.stored_path)
+                text, word_count, title = load_document_text(document)
                 
                 if not text or len(text.strip()) < 50:
                     return jsonify({
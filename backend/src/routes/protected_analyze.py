@@ -5,22 +5,54 @@ from src.extensions import db
 from src.models.user import User
 from src.models.document import Document
 from src.models.analysis import Analysis
-from src.models.citation import Citation
-from src.services.pdf_service import extract_text_and_meta
+from src.services.pdf_service import extract_text_and_meta_cached
 from src.services.summarizer_service import summarize
 from src.services.plagiarism_service import check_plagiarism, check
 from src.services.citations_service import validate as validate_citations
-from src.services.factcheck_service import extract_claims, fact_check_claims
+from src.services.persist_service import enqueue_citations
 from src.utils.normalizers import (
     normalize_plagiarism_result,
     normalize_citations_result,
-    normalize_factcheck_result,
+    run_fact_check,
     safe_call_service
 )
+from src.utils.concurrency import submit_cpu_bound, submit_with_app_context
+from src.utils.responses import json_response
+from src.utils.cache import copy_and_sha256
 
 logger = logging.getLogger(__name__)
+_COPY_BUFSIZE = 1024 * 1024  # stream uploads to disk 1MB at a time
+# What validate_citations returns when it fails
+_CITATIONS_FALLBACK = [{"reference": "Unknown", "valid": False}]
 protected_analyze_bp = Blueprint("protected_analyze", __name__, url_prefix="/api/analyze")
 
+def _response_from_analysis(document, analysis):
+    """Rebuild the upload response from a previously stored analysis."""
+    citations = [
+        {"reference": str(c.raw_line), "valid": c.status == "verified"}
+        for c in analysis.citations
+    ]
+    facts = [
+        {"claim": str(f.get("claim", "Unknown claim")), "status": str(f.get("status", "Unverified"))}
+        for f in analysis.fact_check_results
+    ]
+    plagiarism_score = float(analysis.plagiarism_score or 0.0)
+    return {
+        "analysis_id": analysis.id,
+        "document_id": document.id,
+        "summary": str(analysis.summary),
+        "plagiarism": plagiarism_score,
+        "plagiarism_details": list(analysis.plagiarism_details or []),
+        "citations": citations,
+        "fact_check": {"facts": facts},
+        "stats": {
+            "word_count": int(document.word_count or 0),
+            "plagiarism_percent": plagiarism_score,
+            "citations_count": len(citations),
+            "fact_checks_count": len(facts),
+        },
+    }
+
 @protected_analyze_bp.route("/upload", methods=["POST"])
 @jwt_required()
 def analyze_and_save():
@@ -28,24 +60,41 @@ def analyze_and_save():
         current_user_id = get_jwt_identity()
         current_user = User.query.get(current_user_id)
         if not current_user:
-            return jsonify({"error": "User not found"}), 404
+            return json_response({"error": "User not found"}, 404)
 
         if "file" not in request.files:
-            return jsonify({"error": "No file provided"}), 400
+            return json_response({"error": "No file provided"}, 400)
         file = request.files["file"]
         if file.filename == "":
-            return jsonify({"error": "No file selected"}), 400
+            return json_response({"error": "No file selected"}, 400)
         if not file.filename.lower().endswith(".pdf"):
-            return jsonify({"error": "Only PDF files are allowed"}), 400
+            return json_response({"error": "Only PDF files are allowed"}, 400)
 
         with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-            file.save(temp_file.name)
+            # hash while writing so the upload is read only once
+            content_sha256 = copy_and_sha256(file.stream, temp_file, _COPY_BUFSIZE)
             temp_path = temp_file.name
 
         try:
-            text, word_count, title = extract_text_and_meta(temp_path)
+            # Identical re-uploads reuse the stored analysis instead of re-running every service
+            existing = (
+                Document.query
+                .filter_by(user_id=current_user_id, content_sha256=content_sha256)
+                .order_by(Document.id.desc())
+                .first()
+            )
+            # Only complete analyses are replayed (None: stored before statuses existed);
+            # pending_persist is still being written and partial had a service fall back
+            if existing is not None and existing.analysis is not None and existing.analysis.status in ("complete", None):
+                return json_response(_response_from_analysis(existing, existing.analysis))
+
+            if existing is not None and existing.extracted_text:
+                # Analysis never completed for the earlier upload, but its text is stored
+                text, word_count, title = existing.extracted_text, existing.word_count or 0, existing.title
+            else:
+                text, word_count, title = extract_text_and_meta_cached(temp_path, content_sha256)
             if not text or len(text.strip()) < 100:
-                return jsonify({"error": "Document text too short"}), 400
+                return json_response({"error": "Document text too short"}, 400)
 
             # Save doc
             document = Document(
@@ -55,71 +104,69 @@ def analyze_and_save():
                 title=title or file.filename,
                 extracted_text=text,
                 word_count=word_count,
+                content_sha256=content_sha256,
             )
             db.session.add(document)
             db.session.flush()
 
-            # Run analysis with safe service calls and normalization
+            # Run the independent analysis services concurrently
+            f_sum = submit_with_app_context(summarize, text)
+            f_plag = submit_cpu_bound(check_plagiarism, text)
+            f_cit = submit_cpu_bound(validate_citations, text)
+            f_fact = submit_with_app_context(run_fact_check, text)
+
+            # Any service falling back marks the result degraded, so it is neither
+            # cached nor reused and re-uploading the PDF retries the analysis
+            degraded = False
+
             try:
-                summary = summarize(text)
-            except Exception:
+                summary = f_sum.result()
+            except Exception as e:
+                logger.error(f"Summarization failed: {e}")
                 summary = "Unable to generate summary."
+                degraded = True
 
-            plagiarism_raw = safe_call_service(check_plagiarism, text)
-            if plagiarism_raw is None:
+            try:
+                plagiarism_raw = f_plag.result()
+            except Exception as e:  # e.g. a broken worker process
+                logger.warning(f"Plagiarism check failed: {e}")
                 plagiarism_raw = safe_call_service(check, text)
+                degraded = True
             plagiarism_result = normalize_plagiarism_result(plagiarism_raw)
 
-            citation_raw = safe_call_service(validate_citations, text)
+            try:
+                citation_raw = f_cit.result()
+            except Exception as e:
+                logger.warning(f"Citation validation failed: {e}")
+                citation_raw = _CITATIONS_FALLBACK
+            if citation_raw == _CITATIONS_FALLBACK:  # validate() also returns this on internal errors
+                degraded = True
             citation_results = normalize_citations_result(citation_raw)
 
-            fact_check_results = []
             try:
-                claims = extract_claims(text)
-                if claims:
-                    fact_check_raw = safe_call_service(fact_check_claims, claims)
-                    fact_check_results = normalize_factcheck_result(fact_check_raw)
+                fact_check_results, fact_check_ok = f_fact.result()
             except Exception as e:
                 logger.warning(f"Fact check failed: {e}")
-                fact_check_results = [{"claim": "Service unavailable", "status": "Unverified"}]
+                fact_check_results, fact_check_ok = [{"claim": "Service unavailable", "status": "Unverified"}], False
+            degraded = degraded or not fact_check_ok
 
-            # Save analysis
+            # Save analysis; citations are written by the background persist worker
             analysis = Analysis(
                 document_id=document.id,
                 summary=summary,
                 plagiarism_score=plagiarism_result.get("plagiarism_score", 0.0),
                 plagiarism_details=plagiarism_result.get("matching_sources", []),
                 fact_check_results=fact_check_results,
+                status="pending_persist",
             )
             db.session.add(analysis)
-
-            # Save citations
-            for c in citation_results:
-                citation = Citation(
-                    analysis_id=analysis.id,
-                    raw_text=str(c.get("reference", "")),
-                    cleaned_title=str(c.get("reference", "")),
-                    doi=c.get("doi"),
-                    status="verified" if c.get("valid", False) else "unverified",
-                )
-                db.session.add(citation)
-
             db.session.commit()
+            enqueue_citations(analysis.id, citation_results, "partial" if degraded else "complete")
 
-            # Format response - ensure consistent structure
-            formatted_citations = []
-            for c in citation_results:
-                formatted_citations.append({
-                    "reference": str(c.get("reference", "Unknown")),
-                    "valid": bool(c.get("valid", False))
-                })
-
-            formatted_facts = []
-            for f in fact_check_results:
-                formatted_facts.append({
-                    "claim": str(f.get("claim", "Unknown claim")),
-                    "status": str(f.get("status", "Unverified"))
-                })
+            # The normalizers already guarantee {"reference": str, "valid": bool} and
+            # {"claim": str, "status": str} items, so no second formatting pass is needed
+            formatted_citations = citation_results
+            formatted_facts = fact_check_results
 
             response = {
                 "analysis_id": analysis.id,
@@ -137,16 +184,18 @@ def analyze_and_save():
                 },
             }
 
-            return jsonify(response), 200
+            return json_response(response)
 
         finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+            try:
+                os.unlink(temp_path)
+            except FileNotFoundError:
+                pass
 
     except Exception as e:
         db.session.rollback()
         logger.error(f"Analysis failed: {e}")
-        return jsonify({"error": f"Analysis failed: {str(e)}"}), 500
+        return json_response({"error": f"Analysis failed: {str(e)}"}, 500)
 
 @protected_analyze_bp.route("/health", methods=["GET"])
 def health_check():
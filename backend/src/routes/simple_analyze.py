@@ -1,85 +1,102 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request
 import os, tempfile, logging
-from src.services.pdf_service import extract_text_and_meta
+from src.services.pdf_service import extract_text_and_meta_cached
 from src.services.summarizer_service import summarize
 from src.services.plagiarism_service import check_plagiarism, check
 from src.services.citations_service import validate as validate_citations
-from src.services.factcheck_service import extract_claims, fact_check_claims
 from src.utils.normalizers import (
     normalize_plagiarism_result,
     normalize_citations_result,
-    normalize_factcheck_result,
+    run_fact_check,
     safe_call_service
 )
+from src.utils.concurrency import submit_cpu_bound, submit_with_app_context
+from src.utils.responses import json_response
+from src.utils.cache import LRUCache, copy_and_sha256
 
 logger = logging.getLogger(__name__)
+_COPY_BUFSIZE = 1024 * 1024  # stream uploads to disk 1MB at a time
+# What validate_citations returns when it fails
+_CITATIONS_FALLBACK = [{"reference": "Unknown", "valid": False}]
 simple_analyze_bp = Blueprint("simple_analyze", __name__, url_prefix="/api/simple")
 
+# content_sha256 -> response dict; this route has no DB, so the cache is in-process only
+_response_cache = LRUCache(maxsize=int(os.getenv("ANALYSIS_CACHE_SIZE", "256")))
+
 @simple_analyze_bp.route("/upload", methods=["POST"])
 def analyze_document():
     try:
         if "file" not in request.files:
-            return jsonify({"error": "No file provided"}), 400
+            return json_response({"error": "No file provided"}, 400)
 
         file = request.files["file"]
         if file.filename == "":
-            return jsonify({"error": "No file selected"}), 400
+            return json_response({"error": "No file selected"}, 400)
         if not file.filename.lower().endswith(".pdf"):
-            return jsonify({"error": "Only PDF files are allowed"}), 400
+            return json_response({"error": "Only PDF files are allowed"}, 400)
 
         with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-            file.save(temp_file.name)
+            # hash while writing so the upload is read only once
+            content_sha256 = copy_and_sha256(file.stream, temp_file, _COPY_BUFSIZE)
             temp_path = temp_file.name
 
         try:
+            # Identical re-uploads skip extraction and every analysis service
+            cached = _response_cache.get(content_sha256)
+            if cached is not None:
+                return json_response(cached)
+
             # Extract text
-            text, word_count, title = extract_text_and_meta(temp_path)
+            text, word_count, title = extract_text_and_meta_cached(temp_path, content_sha256)
             if not text or len(text.strip()) < 100:
-                return jsonify({"error": "Document text too short"}), 400
+                return json_response({"error": "Document text too short"}, 400)
+
+            # Run the independent analysis services concurrently
+            logger.info("Running summarization, plagiarism, citations and fact check...")
+            f_sum = submit_with_app_context(summarize, text)
+            f_plag = submit_cpu_bound(check_plagiarism, text)
+            f_cit = submit_cpu_bound(validate_citations, text)
+            f_fact = submit_with_app_context(run_fact_check, text)
+
+            # Any service falling back marks the result degraded, so it is neither
+            # cached nor reused and re-uploading the PDF retries the analysis
+            degraded = False
 
-            # Run analysis with safe service calls and normalization
-            logger.info("Running summarization...")
             try:
-                summary = summarize(text)
+                summary = f_sum.result()
             except Exception as e:
                 logger.error(f"Summarization failed: {e}")
                 summary = "Unable to generate summary."
+                degraded = True
 
-            logger.info("Running plagiarism check...")
-            plagiarism_raw = safe_call_service(check_plagiarism, text)
-            if plagiarism_raw is None:
+            try:
+                plagiarism_raw = f_plag.result()
+            except Exception as e:  # e.g. a broken worker process
+                logger.warning(f"Plagiarism check failed: {e}")
                 plagiarism_raw = safe_call_service(check, text)
+                degraded = True
             plagiarism_result = normalize_plagiarism_result(plagiarism_raw)
 
-            logger.info("Validating citations...")
-            citation_raw = safe_call_service(validate_citations, text)
+            try:
+                citation_raw = f_cit.result()
+            except Exception as e:
+                logger.warning(f"Citation validation failed: {e}")
+                citation_raw = _CITATIONS_FALLBACK
+            if citation_raw == _CITATIONS_FALLBACK:  # validate() also returns this on internal errors
+                degraded = True
             citation_results = normalize_citations_result(citation_raw)
 
-            logger.info("Running fact check...")
-            fact_check_results = []
             try:
-                claims = extract_claims(text)
-                if claims:
-                    fact_check_raw = safe_call_service(fact_check_claims, claims)
-                    fact_check_results = normalize_factcheck_result(fact_check_raw)
+                fact_check_results, fact_check_ok = f_fact.result()
             except Exception as e:
                 logger.warning(f"Fact check failed: {e}")
-                fact_check_results = [{"claim": "Service unavailable", "status": "Unverified"}]
-
-            # Format for frontend - ensure consistent structure
-            formatted_citations = []
-            for c in citation_results:
-                formatted_citations.append({
-                    "reference": str(c.get("reference", "Unknown")),
-                    "valid": bool(c.get("valid", False))
-                })
-
-            formatted_facts = []
-            for f in fact_check_results:
-                formatted_facts.append({
-                    "claim": str(f.get("claim", "Unknown claim")),
-                    "status": str(f.get("status", "Unverified"))
-                })
+                fact_check_results, fact_check_ok = [{"claim": "Service unavailable", "status": "Unverified"}], False
+            degraded = degraded or not fact_check_ok
+
+            # The normalizers already guarantee {"reference": str, "valid": bool} and
+            # {"claim": str, "status": str} items, so no second formatting pass is needed
+            formatted_citations = citation_results
+            formatted_facts = fact_check_results
 
             # Final response with guaranteed structure
             response = {
@@ -96,12 +113,16 @@ def analyze_document():
                 }
             }
 
-            return jsonify(response), 200
+            if not degraded:
+                _response_cache.set(content_sha256, response)
+            return json_response(response)
 
         finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+            try:
+                os.unlink(temp_path)
+            except FileNotFoundError:
+                pass
 
     except Exception as e:
         logger.error(f"Simple analysis failed: {e}")
-        return jsonify({"error": f"Analysis failed: {str(e)}"}), 500
+        return json_response({"error": f"Analysis failed: {str(e)}"}, 500)
@@ -1,10 +1,20 @@
 import re
+import hashlib
 import logging
-from typing import List, Dict
+from bisect import bisect_right
+from typing import Iterator, List, Dict, Tuple
 import os
 
+from src.utils.cache import LRUCache
+
 logger = logging.getLogger(__name__)
 
+# Reference entries are flushed once they grow past this many characters
+MAX_REFERENCE_CHARS = int(os.getenv("CITATION_MAX_ENTRY_CHARS", "8192"))
+
+# validate() results for recently seen texts
+_RESULTS_CACHE = LRUCache(maxsize=128)
+
 _DOI_RE = re.compile(r'\b10\.\d{4,9}/[-._;()/:A-Z0-9]+\b', re.IGNORECASE)
 _URL_RE = re.compile(r'https?://[^\s<>")]+', re.IGNORECASE)
 
@@ -13,7 +23,29 @@ _APA_INTEXT_RE = re.compile(r'\(([A-Z][A-Za-z\-]+(?:\s*&\s*[A-Z][A-Za-z\-]+)?(?:
 # Numeric in-text [12] or [1,2,3]
 _NUM_INTEXT_RE = re.compile(r'\[(\d+(?:\s*,\s*\d+)*)\]')
 
+# Both in-text styles as one alternation so the body is scanned once; dispatch on lastgroup.
+# DOIs/URLs get their own pattern (_DOI_URL_RE) scanned over the bibliography only, so a
+# link in the body can never swallow an adjacent in-text citation.
+_INTEXT_RE = re.compile(
+    rf'(?P<apa>{_APA_INTEXT_RE.pattern})'
+    rf'|(?P<num>{_NUM_INTEXT_RE.pattern})'
+)
+
 _SECTION_HEAD_RE = re.compile(r'^\s*(references|bibliography|works\s+cited)\s*$', re.IGNORECASE)
+# Next ALLCAPS section header after the references (APPENDIX A, RESULTS, ...)
+_NEXT_SECTION_RE = re.compile(r'^[A-Z][A-Z0-9 ._-]{3,}$')
+# IEEE-style numbered reference entry: [12] ...
+_IEEE_NUM_RE = re.compile(r'^\s*\[\d+\]\s+')
+
+# DOI or URL in one pass (bibliography scan, and stripped in one sub() for title guessing),
+# then quoted title or "(2019). Title."
+_DOI_URL_RE = re.compile(rf'(?P<doi>(?i:{_DOI_RE.pattern}))|(?P<url>(?i:{_URL_RE.pattern}))')
+_QUOTED_RE = re.compile(r'"([^"]+)"')
+_TITLE_RE = re.compile(r'"(?P<q>[^"]+)"|\((?P<y>\d{4}[a-z]?)\)\.?\s*(?P<py>.+?)\.')
+_SENTENCE_SPLIT_RE = re.compile(r'\.\s+')
+
+# _iter_reference_entries states
+_BEFORE_REFS, _IN_REFS = 0, 1
 
 # Check if external API services are available
 def _has_external_apis():
@@ -27,63 +59,78 @@ def _has_external_apis():
     
     return has_semantic or has_crossref
 
-def _split_lines(text: str) -> List[str]:
-    return [ln.strip() for ln in text.splitlines()]
+def _iter_reference_entries(text: str) -> Iterator[Tuple[str, int, int]]:
+    """
+    Walk the lines of text once and yield reference entries as (entry, start, end),
+    with offsets spanning the entry in text. Entries are split on empty lines or
+    lines starting with [n]; the references section ends at the next ALLCAPS header.
+    """
+    state = _BEFORE_REFS
+    buf_parts: List[str] = []
+    buf_len = 0
+    buf_start = buf_end = 0
+    pos = 0
 
-def _find_references_block(lines: List[str]) -> List[str]:
-    """Return lines that appear to belong to the references section."""
-    refs_start = None
-    for idx, ln in enumerate(lines):
-        if _SECTION_HEAD_RE.match(ln):
-            refs_start = idx + 1
-            break
-    if refs_start is None:
-        return []
-
-    # collect until next big ALLCAPS/numbered header or end
-    block = []
-    for ln in lines[refs_start:]:
-        if ln.strip() == "":
-            block.append(ln)
+    for raw in text.splitlines(keepends=True):
+        start, end = pos, pos + len(raw)
+        pos = end
+        ln = raw.strip()
+
+        if state == _BEFORE_REFS:
+            if _SECTION_HEAD_RE.match(ln):
+                state = _IN_REFS
             continue
-        # crude next-section detector
-        if re.match(r'^[A-Z][A-Z0-9 ._-]{3,}$', ln) and len(ln.split()) <= 6:
-            # Ex: APPENDIX A, RESULTS, SUPPLEMENT, etc.
+
+        # crude next-section detector, e.g. APPENDIX A, RESULTS, SUPPLEMENT
+        if ln and _NEXT_SECTION_RE.match(ln) and len(ln.split()) <= 6:
             break
-        block.append(ln)
-    return block
-
-def _chunk_references(ref_lines: List[str]) -> List[str]:
-    """Group reference entries from lines (empty line or line starting with [n] splits)."""
-    entries, buf = [], []
-    for ln in ref_lines:
-        if not ln or re.match(r'^\s*\[\d+\]\s+', ln):  # IEEE style numbered
-            if buf:
-                entries.append(" ".join(buf).strip())
-                buf = []
-            if ln and re.match(r'^\s*\[\d+\]\s+', ln):
-                buf.append(ln)
-        else:
-            buf.append(ln)
-    if buf:
-        entries.append(" ".join(buf).strip())
-    # filter short junk
-    return [e for e in entries if len(e) > 20]
+
+        is_numbered = bool(ln) and _IEEE_NUM_RE.match(ln) is not None
+        if not ln or is_numbered:  # IEEE style numbered
+            if buf_parts:
+                entry = " ".join(buf_parts)
+                if len(entry) > 20:  # filter short junk
+                    yield entry, buf_start, buf_end
+                buf_parts = []
+                buf_len = 0
+            if not is_numbered:
+                continue
+        if not buf_parts:
+            buf_start = start
+        buf_parts.append(ln)
+        buf_len += len(ln) + 1
+        buf_end = end
+        # an "entry" this long is not a single citation (e.g. a PDF with no blank lines)
+        if buf_len > MAX_REFERENCE_CHARS:
+            entry = " ".join(buf_parts)
+            yield entry, buf_start, buf_end
+            buf_parts = []
+            buf_len = 0
+
+    if buf_parts:
+        entry = " ".join(buf_parts)
+        if len(entry) > 20:
+            yield entry, buf_start, buf_end
 
 def _extract_title_guess(ref: str) -> str:
     """Very rough title guess: remove DOI/URL and try to grab quoted or between year and period."""
-    cleaned = _DOI_RE.sub('', ref)
-    cleaned = _URL_RE.sub('', cleaned)
-    m = re.search(r'"([^"]+)"|"([^"]+)"', cleaned)
-    if m:
-        return (m.group(1) or m.group(2)).strip()
-
-    # try: after year ... before next period
-    y = re.search(r'\((\d{4}[a-z]?)\)\.?\s*(.+?)\.', cleaned)
-    if y:
-        return y.group(2).strip()
+    cleaned = _DOI_URL_RE.sub('', ref)
+    year_title = None
+    for m in _TITLE_RE.finditer(cleaned):
+        if m.group("q") is not None:
+            return m.group("q").strip()
+        # a quoted title starting inside this match still takes precedence
+        if '"' in m.group(0):
+            q = _QUOTED_RE.search(cleaned)
+            if q:
+                return q.group(1).strip()
+        if year_title is None:
+            # after year ... before next period
+            year_title = m.group("py").strip()
+    if year_title is not None:
+        return year_title
     # fallback: first longish segment
-    parts = [p.strip() for p in re.split(r'\.\s+', cleaned) if len(p.strip()) > 5]
+    parts = [p.strip() for p in _SENTENCE_SPLIT_RE.split(cleaned) if len(p.strip()) > 5]
     return parts[1] if len(parts) > 1 else (parts[0] if parts else cleaned[:120])
 
 def _validate_with_external_apis(citation_data: Dict) -> bool:
@@ -106,36 +153,73 @@ def validate(text: str) -> List[Dict]:
     Always returns a list of dicts: {raw, cleaned_title, doi, url, valid}
     
     This function is designed to work gracefully without external API keys.
+    Results are memoized per text (keyed by a BLAKE2b digest), so repeated calls are cheap.
     """
     try:
         if not text or not text.strip():
             logger.info("Empty text provided for citation validation")
             return []
 
-        lines = _split_lines(text)
-        refs_block = _find_references_block(lines)
-        ref_entries = _chunk_references(refs_block) if refs_block else []
+        key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+        cached = _RESULTS_CACHE.get(key)
+        if cached is not None:
+            # copies so callers can't mutate the cached entries
+            return [dict(r) for r in cached]
+
+        ref_entries = list(_iter_reference_entries(text))
+
+        # In-text citations come from one pass over the text; DOIs/URLs from one pass
+        # over the bibliography span, attributed to the entry whose span contains them.
+        dois = [None] * len(ref_entries)
+        urls = [None] * len(ref_entries)
+        apa_raw: List[str] = []
+        num_raw: List[str] = []
+        # entry start offsets, for mapping DOI/URL hits back to their entry
+        entry_starts = [start for _, start, _ in ref_entries]
+
+        # Cheap substring checks (C-level find) before engaging the regex engine:
+        # without "[" or "(...," there can be no in-text citations.
+        if "[" in text or ("(" in text and "," in text):
+            for m in _INTEXT_RE.finditer(text):
+                if m.lastgroup == "apa":
+                    apa_raw.append(m.group(0))
+                else:
+                    num_raw.append(m.group(0))
+
+        if ref_entries:
+            for m in _DOI_URL_RE.finditer(text, ref_entries[0][1], ref_entries[-1][2]):
+                pos = m.start()
+                entry_idx = bisect_right(entry_starts, pos) - 1
+                if pos >= ref_entries[entry_idx][2]:
+                    continue  # between entries (blank lines, dropped short junk)
+                if m.lastgroup == "url":
+                    if urls[entry_idx] is None:
+                        urls[entry_idx] = m.group(0)
+                    # doi.org style links carry the DOI inside the URL
+                    if dois[entry_idx] is None:
+                        mdoi = _DOI_RE.search(m.group(0))
+                        if mdoi:
+                            dois[entry_idx] = mdoi.group(0)
+                elif dois[entry_idx] is None:
+                    dois[entry_idx] = m.group(0)
 
         results: List[Dict] = []
+        # repeated in-text citations ([12] cited three times) are reported once
+        seen = set()
 
         # 1) Bibliography entries
-        for ref in ref_entries:
+        for i, (ref, _, _) in enumerate(ref_entries):
+            if ref in seen:
+                continue
+            seen.add(ref)
             try:
-                doi = None
-                url = None
-                mdoi = _DOI_RE.search(ref)
-                if mdoi:
-                    doi = mdoi.group(0)
-                murl = _URL_RE.search(ref)
-                if murl:
-                    url = murl.group(0)
                 title = _extract_title_guess(ref)
                 
                 citation_data = {
                     "raw": ref,
                     "cleaned_title": title,
-                    "doi": doi,
-                    "url": url,
+                    "doi": dois[i],
+                    "url": urls[i],
                 }
                 
                 # Use safe validation that handles missing APIs
@@ -154,34 +238,33 @@ def validate(text: str) -> List[Dict]:
                 })
 
         # 2) In-text APA-style (Author, 2017)
-        for m in _APA_INTEXT_RE.finditer(text):
-            try:
-                raw = m.group(0)
-                results.append({
-                    "raw": raw,
-                    "cleaned_title": "",
-                    "doi": None,
-                    "url": None,
-                    "valid": False  # In-text citations can't be validated without reference list
-                })
-            except Exception as e:
-                logger.warning(f"Error processing APA citation: {e}")
+        for raw in apa_raw:
+            if raw in seen:
+                continue
+            seen.add(raw)
+            results.append({
+                "raw": raw,
+                "cleaned_title": "",
+                "doi": None,
+                "url": None,
+                "valid": False  # In-text citations can't be validated without reference list
+            })
 
         # 3) In-text numeric [1], [2,3]
-        for m in _NUM_INTEXT_RE.finditer(text):
-            try:
-                raw = m.group(0)
-                results.append({
-                    "raw": raw,
-                    "cleaned_title": "",
-                    "doi": None,
-                    "url": None,
-                    "valid": False  # In-text citations can't be validated without reference list
-                })
-            except Exception as e:
-                logger.warning(f"Error processing numeric citation: {e}")
+        for raw in num_raw:
+            if raw in seen:
+                continue
+            seen.add(raw)
+            results.append({
+                "raw": raw,
+                "cleaned_title": "",
+                "doi": None,
+                "url": None,
+                "valid": False  # In-text citations can't be validated without reference list
+            })
 
         logger.info("Citations parsed: %d", len(results))
+        _RESULTS_CACHE.set(key, [dict(r) for r in results])
         return results
         
     except Exception as e:
@@ -2,16 +2,16 @@ import os
 import time
 import re
 import logging
-from typing import List, Dict, Any
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterator
 
-import nltk
-from nltk.tokenize import sent_tokenize
+import requests
+from requests.adapters import HTTPAdapter
 
-# Ensure punkt is available (safe no-op if already present)
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt', quiet=True)
+from src.utils.text import tokenize
+from src.utils.cache import LRUCache
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +30,64 @@ API_KEY = (
 FACTCHECK_TIMEOUT = float(os.getenv("FACTCHECK_TIMEOUT", "8.0"))
 MAX_RETRIES = int(os.getenv("FACTCHECK_MAX_RETRIES", "2"))
 DELAY_BETWEEN_CALLS = float(os.getenv("FACTCHECK_DELAY", "0.35"))
+MAX_CONCURRENT = int(os.getenv("FACTCHECK_CONCURRENCY", "8"))
+MAX_RPM = int(os.getenv("FACTCHECK_MAX_RPM", "60"))
+
+class _SlidingWindowLimiter:
+    """Allow at most max_calls per window seconds, shared by all threads and requests."""
+
+    def __init__(self, max_calls: int, window: float = 60.0):
+        self.max_calls = max(1, max_calls)
+        self.window = window
+        self._calls: deque = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0] >= self.window:
+                    self._calls.popleft()
+                if len(self._calls) < self.max_calls:
+                    self._calls.append(now)
+                    return
+                wait = self.window - (now - self._calls[0])
+            time.sleep(wait)
+
+_rate_limiter = _SlidingWindowLimiter(MAX_RPM)
+
+# Successful REST responses keyed by cleaned query, so re-runs on a paper skip the network
+_REST_CACHE = LRUCache(maxsize=1024)
+# Keep-alive connections reused across REST calls; sized so each worker thread gets one
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=max(1, MAX_CONCURRENT), max_retries=0))
+# Claims whose token sets overlap at least this much share one lookup
+DEDUPE_JACCARD = 0.7
+
+# Discovery client, built once and shared across requests
+_SERVICE_SINGLETON = None
+_SERVICE_CREDS = None
+_SERVICE_LOCK = threading.Lock()
+# httplib2 transports are not thread-safe, so each thread executes requests on its own
+_SERVICE_HTTP = threading.local()
+
+# Rough sentence boundaries for claim extraction (the filters tolerate imperfect splits)
+_SENT_SPLIT = re.compile(r'(?<=[.!?])\s+')
+# Section/boilerplate words that disqualify a sentence as a claim
+_HEADER_RE = re.compile(r'abstract|keywords|references|appendix|figure|table', re.IGNORECASE)
+_DIGITS = '0123456789'
+
+# claimReview rating buckets; falsy is checked first so "not true"/"incorrect" aren't read as true
+_FALSY_RE = re.compile(r'\b(mostly false|partly false|false|incorrect|inaccurate|not true|untrue)\b')
+_TRUTHY_RE = re.compile(r'\b(mostly true|true|correct|accurate)\b')
+
+# _clean_query patterns, compiled once
+_RE_CTRL = re.compile(r'[\x00-\x1f\x7f-\x9f]')
+_RE_WS = re.compile(r'\s+')
+_RE_BRACKETS = re.compile(r'\[[^\]]+\]')
+_RE_PARENS = re.compile(r'\([^)]+\)')
+# smart quotes -> ASCII in a single translate() pass
+_QUOTE_TABLE = str.maketrans({'\u201c': '"', '\u201d': '"', '\u2018': "'", '\u2019': "'"})
 
 def _is_valid_service_account_file(filepath: str) -> bool:
     """Check if the service account file exists and is valid."""
@@ -60,17 +118,25 @@ def _has_valid_credentials() -> bool:
 
 def _clean_query(s: str, max_len: int = 110) -> str:
     s = " ".join(s.split())
-    s = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', s)  # control chars
-    s = s.replace('"', '"').replace('"', '"').replace("'", "'")
-    s = re.sub(r'\s+', ' ', s)
+    s = _RE_CTRL.sub('', s)  # control chars
+    s = s.translate(_QUOTE_TABLE)
+    s = _RE_WS.sub(' ', s)
     # strip citation brackets and long numbers
-    s = re.sub(r'\[[^\]]+\]', '', s)
-    s = re.sub(r'\([^)]+\)', '', s)
+    s = _RE_BRACKETS.sub('', s)
+    s = _RE_PARENS.sub('', s)
     # limit length
     if len(s) > max_len:
         s = s[:max_len].rsplit(' ', 1)[0]
     return s.strip(" .,:;")
 
+def _iter_sentences(text: str) -> Iterator[str]:
+    """Lazily yield the pieces _SENT_SPLIT.split(text) would return."""
+    start = 0
+    for m in _SENT_SPLIT.finditer(text):
+        yield text[start:m.start()]
+        start = m.end()
+    yield text[start:]
+
 def extract_claims(text: str) -> List[str]:
     """
     Pick 3–8 short, factual-looking sentences, skipping headers and boilerplate.
@@ -80,24 +146,24 @@ def extract_claims(text: str) -> List[str]:
         if not text:
             return []
         
-        sents = sent_tokenize(text)
         claims: List[str] = []
         
-        for s in sents:
+        # Lazy split: stop scanning the document once 8 claims are found
+        for s in _iter_sentences(text):
             try:
                 st = s.strip()
-                low = st.lower()
-                if any(h in low for h in ["abstract", "keywords", "references", "appendix", "figure", "table"]):
-                    continue
+                # cheapest filters first
                 if len(st) < 40 or len(st) > 220:
                     continue
                 if st.endswith(':') or st.endswith(';'):
                     continue
+                if _HEADER_RE.search(st):
+                    continue
                 # avoid sentences dominated by citations/parentheses
                 if st.count('(') + st.count(')') >= 2 or st.count('[') >= 1:
                     continue
-                # avoid % of digits noise
-                if len(re.findall(r'\d', st)) > len(st) * 0.25:
+                # avoid % of digits noise (more than a quarter digits)
+                if sum(st.count(d) for d in _DIGITS) * 4 > len(st):
                     continue
                 claims.append(st)
                 if len(claims) >= 8:
@@ -112,20 +178,41 @@ def extract_claims(text: str) -> List[str]:
         return []
 
 def _init_service():
-    """Return Google Fact Check discovery client if possible; else None."""
+    """Return Google Fact Check discovery client if possible; else None. Built once per process."""
+    global _SERVICE_SINGLETON, _SERVICE_CREDS
+    if _SERVICE_SINGLETON is not None:
+        return _SERVICE_SINGLETON
     if not SERVICE_ACCOUNT_FILE or not _is_valid_service_account_file(SERVICE_ACCOUNT_FILE):
         return None
-    try:
-        from google.oauth2 import service_account
-        from googleapiclient.discovery import build
-        creds = service_account.Credentials.from_service_account_file(SERVICE_ACCOUNT_FILE)
-        return build("factchecktools", "v1alpha1", credentials=creds, cache_discovery=False)
-    except Exception as e:
-        logger.warning("Could not init FactCheck service account client: %s", e)
-        return None
+    with _SERVICE_LOCK:
+        if _SERVICE_SINGLETON is None:
+            try:
+                from google.oauth2 import service_account
+                from googleapiclient.discovery import build
+                creds = service_account.Credentials.from_service_account_file(SERVICE_ACCOUNT_FILE)
+                # static_discovery reads the discovery document bundled with the client library
+                _SERVICE_SINGLETON = build(
+                    "factchecktools", "v1alpha1", credentials=creds,
+                    cache_discovery=False, static_discovery=True,
+                )
+                _SERVICE_CREDS = creds
+            except Exception as e:
+                logger.warning("Could not init FactCheck service account client: %s", e)
+                return None
+    return _SERVICE_SINGLETON
+
+def _thread_http():
+    """This thread's authorized httplib2 transport, with FACTCHECK_TIMEOUT (httplib2 has none by default)."""
+    http = getattr(_SERVICE_HTTP, "http", None)
+    if http is None:
+        import httplib2
+        from google_auth_httplib2 import AuthorizedHttp
+        http = AuthorizedHttp(_SERVICE_CREDS, http=httplib2.Http(timeout=FACTCHECK_TIMEOUT))
+        _SERVICE_HTTP.http = http
+    return http
 
 def _call_service(service, query: str) -> Dict[str, Any]:
-    """Call the service with proper error handling."""
+    """Call the service, retrying; raises once retries are exhausted."""
     try:
         q = _clean_query(query)
         if not q:
@@ -133,43 +220,80 @@ def _call_service(service, query: str) -> Dict[str, Any]:
         for attempt in range(1, MAX_RETRIES + 1):
             try:
                 req = service.claims().search(query=q)
-                return req.execute()
+                return req.execute(http=_thread_http())
             except Exception as e:
                 if attempt == MAX_RETRIES:
                     raise
                 time.sleep(0.4 * attempt)
     except Exception as e:
+        # re-raised so the claim is reported as api_error rather than "no verdict"
         logger.warning(f"Service call failed: {e}")
-        return {}
+        raise
+
+class _RetryAfterTooLong(RuntimeError):
+    """A 429 asked for a longer wait than FACTCHECK_TIMEOUT; the claim is given up."""
 
 def _call_rest(query: str) -> Dict[str, Any]:
-    """Call the REST API with proper error handling."""
+    """Call the REST API, retrying; raises once retries are exhausted."""
     try:
         q = _clean_query(query)
         if not q or not API_KEY:
             return {}
+        cached = _REST_CACHE.get(q)
+        if cached is not None:
+            return cached
         
-        import requests
         url = "https://factchecktools.googleapis.com/v1alpha1/claims:search"
         params = {"query": q, "key": API_KEY}
         
         for attempt in range(1, MAX_RETRIES + 1):
             try:
-                r = requests.get(url, params=params, timeout=FACTCHECK_TIMEOUT)
+                _rate_limiter.acquire()
+                r = _SESSION.get(url, params=params, timeout=FACTCHECK_TIMEOUT)
+                if r.status_code == 429 and attempt < MAX_RETRIES:
+                    # rate limited: honour Retry-After when the API sends one
+                    retry_after = r.headers.get("Retry-After", "")
+                    wait = float(retry_after) if retry_after.isdigit() else 0.4 * attempt
+                    if wait > FACTCHECK_TIMEOUT:
+                        # don't hold the analysis thread (and the upload) for minutes
+                        raise _RetryAfterTooLong(f"Rate limited; server asked to retry after {retry_after}s")
+                    time.sleep(wait)
+                    continue
                 data = {}
                 try:
                     data = r.json()
                 except Exception:
                     data = {}
                 r.raise_for_status()
+                _REST_CACHE.set(q, data)  # only successful responses are cached
                 return data
             except Exception as e:
-                if attempt == MAX_RETRIES:
+                if attempt == MAX_RETRIES or isinstance(e, _RetryAfterTooLong):
                     raise
                 time.sleep(0.4 * attempt)
     except Exception as e:
         logger.warning(f"REST API call failed: {e}")
-        return {}
+        raise
+
+def _group_similar_claims(claims: List[str]) -> List[int]:
+    """
+    Map each claim to the index of the first earlier claim whose token set has
+    Jaccard similarity >= DEDUPE_JACCARD (or to itself), so near-duplicates share a request.
+    """
+    token_sets = [set(tokenize(c)) for c in claims]
+    reps: List[int] = []
+    for i, toks in enumerate(token_sets):
+        rep = i
+        for j in range(i):
+            if reps[j] != j:
+                continue
+            other = token_sets[j]
+            union = len(toks | other)
+            if union and len(toks & other) / union >= DEDUPE_JACCARD:
+                rep = j
+                break
+        reps.append(rep)
+    return reps
 
 def _status_from_reviews(fact_checks: List[Dict[str, Any]]) -> str:
     """
@@ -194,10 +318,10 @@ def _status_from_reviews(fact_checks: List[Dict[str, Any]]) -> str:
                             rr = r.get("reviewRating", {}) or {}
                         alt = (rr.get("alternateName") or rr.get("ratingValue") or "") if isinstance(rr, dict) else ""
                         alt = str(alt).lower()
-                        if any(k in alt for k in ["true", "correct", "accurate", "mostly true"]):
-                            truthy += 1
-                        if any(k in alt for k in ["false", "incorrect", "inaccurate", "mostly false"]):
+                        if _FALSY_RE.search(alt):
                             falsy += 1
+                        elif _TRUTHY_RE.search(alt):
+                            truthy += 1
                     except Exception as e:
                         logger.warning(f"Error processing review: {e}")
                         continue
@@ -214,7 +338,7 @@ def _status_from_reviews(fact_checks: List[Dict[str, Any]]) -> str:
         logger.error(f"Error determining status from reviews: {e}")
         return "no_verdict"
 
-def fact_check_claims(claims: List[str]) -> List[Dict[str, Any]]:
+def fact_check_claims(claims: List[str], concurrency: int = MAX_CONCURRENT) -> List[Dict[str, Any]]:
     """
     Returns list of dicts:
       { "claim": str, "status": "verified|contradicted|no_verdict|api_error",
@@ -259,30 +383,46 @@ def fact_check_claims(claims: List[str]) -> List[Dict[str, Any]]:
                 })
             return results
 
-        # Process claims
-        for i, c in enumerate(claims[:5]):
+        # The service-account path stays serial to keep its fixed pacing delay; REST calls fan out
+        batch = claims[:5]
+        workers = 1 if use_service else max(1, min(concurrency, len(batch)))
+
+        def check_one(i: int, c: str) -> Dict[str, Any]:
             try:
-                if i:
+                # REST calls are paced by the shared rate limiter; the serial
+                # service-account path keeps its fixed delay
+                if i and use_service:
                     time.sleep(DELAY_BETWEEN_CALLS)
-                
+
                 data = _call_service(service, c) if use_service else _call_rest(c)
                 fcs = data.get("claims", []) if isinstance(data, dict) else []
                 status = _status_from_reviews(fcs)
-                
-                results.append({
+
+                return {
                     "claim": c,
                     "status": status,
                     "fact_checks": fcs,
                     "error": None
-                })
+                }
             except Exception as e:
                 logger.warning("FactCheck processing error for claim: %s", e)
-                results.append({
+                return {
                     "claim": c,
                     "status": "api_error",
                     "fact_checks": [],
                     "error": str(e)
-                })
+                }
+
+        # Process claims; near-duplicates reuse their representative's result
+        reps = _group_similar_claims(batch)
+        unique_idx = [i for i, r in enumerate(reps) if r == i]
+        with ThreadPoolExecutor(max_workers=min(workers, len(unique_idx))) as ex:
+            unique_results = dict(zip(
+                unique_idx,
+                ex.map(check_one, range(len(unique_idx)), [batch[i] for i in unique_idx]),
+            ))
+        for i, c in enumerate(batch):
+            results.append({**unique_results[reps[i]], "claim": c})
 
         return results
         
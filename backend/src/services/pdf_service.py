@@ -1,5 +1,51 @@
 import fitz  # PyMuPDF
 import os
+import gzip
+import json
+import logging
+import tempfile
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+# Extracted text is cached here as <sha256>.json.gz so re-processing a PDF skips parsing.
+# Defaults to <backend>/instance/text_cache (the Flask instance folder), not the cwd.
+TEXT_CACHE_DIR = os.path.abspath(os.getenv("TEXT_CACHE_DIR") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "instance", "text_cache"
+))
+# Oldest entries (by last use) beyond this many are evicted after each write
+TEXT_CACHE_MAX_ENTRIES = int(os.getenv("TEXT_CACHE_MAX_ENTRIES", "500"))
+# Set PDF_PARALLEL=1 to extract PDFs with at least PARALLEL_MIN_PAGES pages in page
+# ranges across worker processes (off by default: it spawns a process pool)
+PDF_PARALLEL = os.getenv("PDF_PARALLEL") == "1"
+PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "64"))
+
+def _extract_page_range(pdf_path, start, stop):
+    """Open the PDF in the current process and extract text of pages [start, stop)."""
+    doc = fitz.open(pdf_path)
+    try:
+        return [doc[i].get_text("text") for i in range(start, stop)]
+    finally:
+        doc.close()
+
+def _extract_pages_parallel(pdf_path, page_count):
+    """
+    Split the pages into one contiguous range per worker process. PyMuPDF is not
+    thread-safe, so each process opens its own document handle.
+    """
+    from src.utils.concurrency import CPU_POOL_WORKERS, get_pdf_pool
+    if CPU_POOL_WORKERS < 2:
+        return _extract_page_range(pdf_path, 0, page_count)
+    pool = get_pdf_pool()
+    step = -(-page_count // CPU_POOL_WORKERS)
+    futures = [
+        pool.submit(_extract_page_range, pdf_path, start, min(start + step, page_count))
+        for start in range(0, page_count, step)
+    ]
+    chunks = []
+    for f in futures:
+        chunks.extend(f.result())
+    return chunks
 
 def extract_text_and_meta(pdf_path):
     """
@@ -9,13 +55,102 @@ def extract_text_and_meta(pdf_path):
     if not os.path.exists(pdf_path):
         raise FileNotFoundError(f"PDF not found: {pdf_path}")
 
-    text = ""
+    chunks = None
+    # Open by path rather than fitz.open(stream=...): MuPDF then reads the file
+    # lazily itself, whereas stream= needs bytes and would copy an mmap whole.
     doc = fitz.open(pdf_path)
-    for page in doc:
-        text += page.get_text("text") + "\n"
+    try:
+        page_count = doc.page_count
+        title = doc.metadata.get("title") or os.path.basename(pdf_path)
+        # collect pages and join once; += on a growing str is quadratic
+        if not PDF_PARALLEL or page_count < PARALLEL_MIN_PAGES:
+            chunks = [page.get_text("text") for page in doc]
+    finally:
+        doc.close()
+
+    if chunks is None:
+        try:
+            chunks = _extract_pages_parallel(pdf_path, page_count)
+        except BrokenProcessPool:
+            # a worker died parsing this file; retrying in-process would crash the server
+            raise ValueError(f"PDF could not be parsed: {os.path.basename(pdf_path)}")
+        except Exception as e:
+            logger.warning(f"Parallel PDF extraction failed, falling back to sequential: {e}")
+            chunks = _extract_page_range(pdf_path, 0, page_count)
 
-    text = text.strip()
+    text = "\n".join(chunks).strip()
     word_count = len(text.split())
-    title = doc.metadata.get("title") or os.path.basename(pdf_path)
 
     return text, word_count, title
+
+def extract_text_and_meta_cached(pdf_path, content_sha256):
+    """
+    Same as extract_text_and_meta, but reuses a previous extraction of the same
+    file contents (keyed by content_sha256) from TEXT_CACHE_DIR.
+    """
+    cache_path = _text_cache_path(content_sha256)
+    try:
+        with open(cache_path, "rb") as f:
+            text, word_count, title = json.loads(gzip.decompress(f.read()))
+        try:
+            os.utime(cache_path)  # mark as recently used for eviction
+        except OSError:
+            pass
+        return text, word_count, title
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable text cache entry {cache_path}: {e}")
+
+    text, word_count, title = extract_text_and_meta(pdf_path)
+
+    try:
+        os.makedirs(TEXT_CACHE_DIR, exist_ok=True)
+        payload = gzip.compress(json.dumps([text, word_count, title]).encode("utf-8"))
+        # write-then-rename so concurrent readers never see a partial file
+        with tempfile.NamedTemporaryFile(dir=TEXT_CACHE_DIR, suffix=".tmp", delete=False) as tmp:
+            tmp.write(payload)
+        os.replace(tmp.name, cache_path)
+        _evict_text_cache()
+    except OSError as e:
+        logger.warning(f"Could not write text cache entry {cache_path}: {e}")
+
+    return text, word_count, title
+
+def load_document_text(document):
+    """
+    (text, word_count, title) for a stored Document: its saved extracted_text if any,
+    else the text cache keyed by its content_sha256, parsing the PDF only as a last resort.
+    """
+    if document.extracted_text:
+        return document.extracted_text, document.word_count or 0, document.title
+    if document.content_sha256:
+        return extract_text_and_meta_cached(document.stored_path, document.content_sha256)
+    return extract_text_and_meta(document.stored_path)
+
+def _text_cache_path(content_sha256):
+    return os.path.join(TEXT_CACHE_DIR, f"{content_sha256}.json.gz")
+
+def _evict_text_cache():
+    """Keep at most TEXT_CACHE_MAX_ENTRIES entries, removing the least recently used."""
+    with os.scandir(TEXT_CACHE_DIR) as it:
+        entries = [e for e in it if e.name.endswith(".json.gz")]
+    if len(entries) <= TEXT_CACHE_MAX_ENTRIES:
+        return
+    entries.sort(key=lambda e: e.stat().st_mtime)
+    for e in entries[:len(entries) - TEXT_CACHE_MAX_ENTRIES]:
+        try:
+            os.unlink(e.path)
+        except FileNotFoundError:
+            pass
+
+def remove_cached_text(content_sha256):
+    """Drop the cached extraction for content_sha256, if any."""
+    if not content_sha256:
+        return
+    try:
+        os.unlink(_text_cache_path(content_sha256))
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Could not remove text cache entry for {content_sha256}: {e}")
@@ -0,0 +1,79 @@
+import os
+import queue
+import logging
+import threading
+from typing import Any, Dict, List
+
+from src.extensions import db
+from src.models.analysis import Analysis
+from src.models.citation import Citation
+
+logger = logging.getLogger(__name__)
+
+# (analysis_id, citation_results, final_status) tasks written off the request path
+_persist_queue: "queue.Queue" = queue.Queue()
+# The worker thread and the pid that started it: after a fork (pre-fork servers) the
+# child inherits these globals but not the running thread, so both are checked before queueing
+_worker_thread = None
+_worker_pid = None
+_worker_lock = threading.Lock()
+
+def _save_citations(analysis_id: int, citation_results: List[Dict[str, Any]], final_status: str = "complete") -> None:
+    """Insert deduplicated citations for an analysis and set its final status."""
+    seen = set()
+    citations_to_add = []
+    for c in citation_results:
+        key = (c.get("reference"), c.get("doi"))
+        if key in seen:
+            continue
+        seen.add(key)
+        citations_to_add.append(Citation(
+            analysis_id=analysis_id,
+            raw_line=str(c.get("reference", "")),
+            cleaned_title=str(c.get("reference", "")),
+            status="verified" if c.get("valid", False) else "unverified",
+        ))
+    db.session.bulk_save_objects(citations_to_add)
+    analysis = Analysis.query.get(analysis_id)
+    if analysis is not None:
+        analysis.status = final_status
+    db.session.commit()
+
+def _persist_citations_worker(app) -> None:
+    """Drain the persist queue forever, one DB session per task."""
+    while True:
+        analysis_id, citation_results, final_status = _persist_queue.get()
+        with app.app_context():
+            try:
+                _save_citations(analysis_id, citation_results, final_status)
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Deferred citation persist failed for analysis {analysis_id}: {e}")
+            finally:
+                db.session.remove()
+                _persist_queue.task_done()
+
+def start_persist_worker(app) -> None:
+    """Start the background persist thread once per process."""
+    global _worker_thread, _worker_pid
+    with _worker_lock:
+        if _worker_running():
+            return
+        _worker_thread = threading.Thread(
+            target=_persist_citations_worker, args=(app,), name="citation-persist", daemon=True
+        )
+        _worker_thread.start()
+        _worker_pid = os.getpid()
+
+def _worker_running() -> bool:
+    return _worker_thread is not None and _worker_pid == os.getpid() and _worker_thread.is_alive()
+
+def enqueue_citations(analysis_id: int, citation_results: List[Dict[str, Any]], final_status: str = "complete") -> None:
+    """
+    Queue citations for background insert; writes inline if no worker is running in this process.
+    The analysis gets final_status ("complete", or "partial" if a service fell back) once written.
+    """
+    if _worker_running():
+        _persist_queue.put((analysis_id, citation_results, final_status))
+    else:
+        _save_citations(analysis_id, citation_results, final_status)
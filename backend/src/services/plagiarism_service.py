@@ -1,20 +1,56 @@
+import os
 import re
 import logging
 from typing import Dict, List
-from collections import Counter
+
+import numpy as np
+
+from src.utils.text import TOKEN_PATTERN
 
 logger = logging.getLogger(__name__)
 
+_SHINGLE_N = 7
+# 64-bit FNV prime for the polynomial rolling hash (uint64 arithmetic wraps mod 2**64)
+_HASH_PRIME = np.uint64(0x100000001b3)
+_SENT_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+# Sentences are joined with NUL, which this pattern returns as its own token, so a single
+# findall yields every word plus the sentence boundaries
+_SENT_BREAK = "\x00"
+_TOKEN_OR_BREAK_RE = re.compile(rf"{TOKEN_PATTERN}|\x00")
+# Above this many characters only shingles whose hash has its top SAMPLE_BITS bits clear
+# are scored (1 in 2**SAMPLE_BITS). Every copy of a shingle shares its hash, so repeats are
+# kept or dropped together and the duplicate ratio of the sample estimates the full one.
+SAMPLE_MIN_CHARS = int(os.getenv("PLAGIARISM_SAMPLE_MIN_CHARS", "100000"))
+SAMPLE_BITS = 3
+
 def _sentences(text: str) -> List[str]:
     # simple sentence split; avoids NLTK dependency here
-    parts = re.split(r'(?<=[.!?])\s+', text)
+    parts = _SENT_SPLIT_RE.split(text)
     return [p.strip() for p in parts if len(p.strip()) > 0]
 
-def _ngrams(tokens: List[str], n: int) -> List[str]:
-    return [' '.join(tokens[i:i+n]) for i in range(len(tokens) - n + 1)]
+def _mix64(x: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer: spread small interned ids over all 64 bits (vectorised)."""
+    x = x ^ (x >> np.uint64(30))
+    x *= np.uint64(0xbf58476d1ce4e5b9)
+    x ^= x >> np.uint64(27)
+    x *= np.uint64(0x94d049bb133111eb)
+    x ^= x >> np.uint64(31)
+    return x
 
-def _tokenize(s: str) -> List[str]:
-    return re.findall(r"[A-Za-z0-9']+", s.lower())
+def _shingle_hashes(ids: np.ndarray, seg: np.ndarray, n: int) -> np.ndarray:
+    """
+    Hash every n-token window of ids (mixed per-token uint64 ids) into a uint64, dropping
+    windows that span two segments (sentences); seg holds the segment of each token.
+    """
+    m = len(ids) - n + 1
+    if m <= 0:
+        return np.empty(0, dtype=np.uint64)
+    # in-place multiply-add keeps this to one output buffer for all n rounds
+    h = ids[:m].copy()
+    for k in range(1, n):
+        h *= _HASH_PRIME
+        h += ids[k:k + m]
+    return h[seg[:m] == seg[n - 1:]]
 
 def check_plagiarism(text: str) -> Dict:
     """
@@ -30,18 +66,41 @@ def check_plagiarism(text: str) -> Dict:
     if len(sents) < 5:
         return {"plagiarism_score": 0.0, "matching_sources": []}
 
-    all_shingles: Counter = Counter()
-    for s in sents:
-        toks = _tokenize(s)
-        sh = _ngrams(toks, 7)
-        all_shingles.update(sh)
+    if _SENT_BREAK in text:
+        sents = [s.replace(_SENT_BREAK, " ") for s in sents]
+
+    # One tokenize pass over all kept sentences, with a break token between them
+    tokens = _TOKEN_OR_BREAK_RE.findall(_SENT_BREAK.join(sents).lower())
+
+    # Intern tokens to ids in first-seen order (the break token is id 0). Unlike hash(str),
+    # which PYTHONHASHSEED randomises per process, this keeps the sampled subset and so the
+    # score reproducible across restarts and pool workers.
+    vocab: Dict[str, int] = {_SENT_BREAK: 0}
+    raw_ids = np.fromiter(
+        (vocab.setdefault(t, len(vocab)) for t in tokens), dtype=np.uint64, count=len(tokens)
+    )
+    # Segment (sentence) of each word from the break tokens, which are then dropped
+    is_break = raw_ids == 0
+    segments = np.cumsum(is_break)
+    is_word = ~is_break
+    token_ids = _mix64(raw_ids[is_word])
+    hashes = _shingle_hashes(token_ids, segments[is_word], _SHINGLE_N)
+    if len(text) >= SAMPLE_MIN_CHARS:
+        sampled = hashes[(hashes >> np.uint64(64 - SAMPLE_BITS)) == 0]
+        if sampled.size:
+            hashes = sampled
 
-    if not all_shingles:
+    if hashes.size == 0:
         score = 0.0
     else:
-        dup = sum(c for c in all_shingles.values() if c > 1)
-        total = sum(all_shingles.values())
-        score = min(1.0, dup / max(1, total))
+        # After sorting, a shingle is repeated iff it equals a neighbour; total is just the size
+        hashes.sort()
+        same = hashes[1:] == hashes[:-1]
+        repeated = np.zeros(hashes.size, dtype=bool)
+        repeated[1:] |= same
+        repeated[:-1] |= same
+        dup = int(np.count_nonzero(repeated))
+        score = min(1.0, dup / hashes.size)
 
     logger.info("Heuristic plagiarism score: %.3f", score)
     return {"plagiarism_score": float(score), "matching_sources": []}
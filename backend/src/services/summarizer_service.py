@@ -1,10 +1,19 @@
 import re
 import logging
 import os
+import threading
+from functools import lru_cache
 from flask import current_app
 
-# Cache models in memory so they don't reload every request
-_model_cache = {}
+_SENT_RE = re.compile(r'[.!?]+')
+# Substring match (no word boundaries) to score exactly like the old per-keyword `in` checks
+_KW_RE = re.compile(
+    r'study|result|method|conclude|finding|research|analysis|experiment|data|'
+    r'significant|demonstrate|propose|novel|approach|framework|model|algorithm'
+)
+
+# Serialises the first (slow) model build when several worker threads summarise at once
+_build_lock = threading.Lock()
 
 def summarize_text(text: str) -> str:
     """Summarize text (shortcut for direct calls)."""
@@ -32,31 +41,52 @@ def summarize(text: str, use_hf: bool = True) -> str:
     else:
         return _summarize_heuristic(text)
 
+@lru_cache(maxsize=4)
+def _build_summarizer(model_name: str, cache_dir: str, device: int, quantize: bool = False):
+    """Load a HuggingFace summarization pipeline; cached per (model, cache_dir, device, quantize)."""
+    try:
+        from transformers import pipeline
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+        logging.info(f"Loading HuggingFace model: {model_name}")
+        summarizer = pipeline(
+            "summarization",
+            model=model_name,
+            cache_dir=cache_dir,
+            device=device,  # -1 for CPU, 0 for GPU
+            framework="pt"
+        )
+        if quantize and device < 0:
+            try:
+                summarizer.model = _quantize_int8(summarizer.model)
+            except Exception as e:
+                # e.g. a torch build without a quantized engine: keep serving FP32
+                logging.warning(f"INT8 quantization failed, using the FP32 model: {e}")
+        logging.info("HuggingFace summarizer loaded successfully.")
+        return summarizer
+    except ImportError as e:
+        raise Exception(f"transformers library not installed: {e}")
+    except Exception as e:
+        raise Exception(f"Failed to load HuggingFace model: {e}")
+
 def _get_summarizer():
-    """Load and cache HuggingFace summarizer."""
-    if 'summarizer' not in _model_cache:
-        try:
-            from transformers import pipeline
-            
-            model_name = current_app.config.get('HF_MODEL_NAME', 'facebook/bart-large-cnn')
-            cache_dir = current_app.config.get('HF_CACHE_DIR', './models_cache')
-            os.makedirs(cache_dir, exist_ok=True)
-            
-            logging.info(f"Loading HuggingFace model: {model_name}")
-            _model_cache['summarizer'] = pipeline(
-                "summarization",
-                model=model_name,
-                cache_dir=cache_dir,
-                device=-1,  # -1 for CPU, 0 for GPU
-                framework="pt"
-            )
-            logging.info("HuggingFace summarizer loaded successfully.")
-        except ImportError as e:
-            raise Exception(f"transformers library not installed: {e}")
-        except Exception as e:
-            raise Exception(f"Failed to load HuggingFace model: {e}")
-    
-    return _model_cache['summarizer']
+    """Return the cached HuggingFace summarizer for the current app config."""
+    model_name = current_app.config.get('HF_MODEL_NAME', 'facebook/bart-large-cnn')
+    cache_dir = current_app.config.get('HF_CACHE_DIR', './models_cache')
+    device = int(current_app.config.get('HF_DEVICE', -1))
+    quantize = bool(current_app.config.get('HF_QUANTIZE_INT8', True))
+    with _build_lock:
+        return _build_summarizer(model_name, cache_dir, device, quantize)
+
+def _quantize_int8(model):
+    """Dynamic INT8 quantization of the Linear layers for faster CPU inference."""
+    import torch
+
+    logging.info("Quantizing summarizer Linear layers to INT8")
+    model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    model.eval()
+    return model
 
 def _summarize_with_hf(text: str) -> str:
     """Summarize using HuggingFace model with chunking and truncation."""
@@ -85,22 +115,24 @@ def _summarize_with_hf(text: str) -> str:
         if current_chunk:
             chunks.append(current_chunk.strip())
 
+    chunks = [c for c in chunks if len(c.strip()) >= 50]
+    summary_kwargs = dict(max_length=150, min_length=50, truncation=True, do_sample=False)
+    batch_size = int(current_app.config.get('HF_BATCH_SIZE', 4))
+
     summaries = []
-    for chunk in chunks:
-        if len(chunk.strip()) < 50:
-            continue
-        try:
-            summary = summarizer(
-                chunk,
-                max_length=150,
-                min_length=50,
-                truncation=True,
-                do_sample=False
-            )[0]['summary_text']
-            summaries.append(summary.strip())
-        except Exception as e:
-            logging.warning(f"Chunk summarization failed: {e}")
-            continue
+    try:
+        # One pipeline call for all chunks amortises pre/post-processing overhead
+        outputs = summarizer(chunks, batch_size=batch_size, **summary_kwargs)
+        summaries = [o['summary_text'].strip() for o in outputs]
+    except Exception as e:
+        logging.warning(f"Batched summarization failed, retrying per chunk: {e}")
+        for chunk in chunks:
+            try:
+                summary = summarizer(chunk, **summary_kwargs)[0]['summary_text']
+                summaries.append(summary.strip())
+            except Exception as e:
+                logging.warning(f"Chunk summarization failed: {e}")
+                continue
 
     if not summaries:
         raise Exception("No summaries generated from any chunk.")
@@ -126,13 +158,8 @@ def _summarize_with_hf(text: str) -> str:
 def _summarize_heuristic(text: str) -> str:
     """Fallback: pick important sentences."""
     sentences = _split_into_sentences(text)
-    important_keywords = [
-        'study', 'result', 'method', 'conclude', 'finding', 'research',
-        'analysis', 'experiment', 'data', 'significant', 'demonstrate',
-        'propose', 'novel', 'approach', 'framework', 'model', 'algorithm'
-    ]
     sentence_scores = []
-    for sentence in sentences:
+    for idx, sentence in enumerate(sentences):
         if len(sentence.split()) < 5:
             continue
         score = 0
@@ -142,28 +169,28 @@ def _summarize_heuristic(text: str) -> str:
             score += 2
         elif 10 <= word_count <= 40:
             score += 1
-        for keyword in important_keywords:
-            if keyword in s_lower:
-                score += 1
-        idx = sentences.index(sentence)
+        # One point per distinct keyword present
+        score += len(set(_KW_RE.findall(s_lower)))
         if idx < len(sentences) * 0.2 or idx > len(sentences) * 0.8:
             score += 1
-        sentence_scores.append((sentence, score))
+        sentence_scores.append((idx, sentence, score))
     
-    sentence_scores.sort(key=lambda x: x[1], reverse=True)
+    sentence_scores.sort(key=lambda x: x[2], reverse=True)
     selected = []
     total_words = 0
-    for sentence, score in sentence_scores:
-        if total_words + len(sentence.split()) <= 200:
-            selected.append(sentence)
-            total_words += len(sentence.split())
+    for idx, sentence, score in sentence_scores:
+        n_words = len(sentence.split())
+        if total_words + n_words <= 200:
+            selected.append(idx)
+            total_words += n_words
         if len(selected) >= 7 or total_words >= 180:
             break
     if not selected:
-        selected = sentences[:3]
-    return ' '.join([s for s in sentences if s in selected])
+        return ' '.join(sentences[:3])
+    # Emit in document order
+    return ' '.join(sentences[i] for i in sorted(selected))
 
 def _split_into_sentences(text: str) -> list[str]:
     """Split text into sentences."""
-    sentences = re.split(r'[.!?]+', text)
+    sentences = _SENT_RE.split(text)
     return [s.strip() for s in sentences if len(s.strip()) > 10]
@@ -0,0 +1,49 @@
+"""
+In-process caching helpers keyed by content hashes.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, BinaryIO, Hashable, Optional
+
+_HASH_CHUNK = 1024 * 1024
+
+def copy_and_sha256(src: BinaryIO, dst: BinaryIO, chunk_size: int = _HASH_CHUNK) -> str:
+    """Copy src to dst in chunks, hashing on the way; returns the hex SHA-256."""
+    h = hashlib.sha256()
+    while True:
+        chunk = src.read(chunk_size)
+        if not chunk:
+            break
+        h.update(chunk)
+        dst.write(chunk)
+    return h.hexdigest()
+
+class LRUCache:
+    """Small thread-safe LRU mapping; the oldest entry is evicted past maxsize."""
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
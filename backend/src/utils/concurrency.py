@@ -0,0 +1,94 @@
+"""
+Concurrency helpers for running independent analysis services in parallel.
+"""
+import os
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+# Shared across requests so worker threads are not re-created per upload
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "8"))
+ANALYSIS_EXECUTOR = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix="analysis")
+
+# Set ANALYSIS_CPU_BOUND=1 to run pure-Python services (plagiarism, citations) in
+# worker processes, sidestepping the GIL; I/O-bound calls stay on the thread pool.
+ANALYSIS_CPU_BOUND = os.getenv("ANALYSIS_CPU_BOUND") == "1"
+CPU_POOL_WORKERS = min(4, os.cpu_count() or 1)
+# Pools are created lazily from request threads while other threads are running, and
+# fork()ing a multi-threaded process can deadlock, so never use the "fork" start method.
+_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+class LazyProcessPool:
+    """
+    ProcessPoolExecutor created on first use rather than at import (reloader-safe), and
+    replaced if a worker dies (segfault, OOM kill) and leaves the executor broken.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def get(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=_MP_CONTEXT)
+        return self._pool
+
+    def _reset(self, broken: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._pool is broken:
+                self._pool = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, func, *args, **kwargs):
+        """Submit func; if the pool is broken, recreate it and retry once."""
+        pool = self.get()
+        try:
+            return pool.submit(func, *args, **kwargs)
+        except BrokenProcessPool:
+            logger.warning("Process pool is broken (a worker died); recreating it")
+            self._reset(pool)
+            return self.get().submit(func, *args, **kwargs)
+
+_cpu_pool = LazyProcessPool(CPU_POOL_WORKERS)
+# Separate pool for PDF page extraction, so a PyMuPDF crash on a malformed file
+# cannot take down the pool the plagiarism/citation services share
+_pdf_pool = LazyProcessPool(CPU_POOL_WORKERS)
+
+def with_app_context(app, func):
+    """Wrap func so it runs inside app's context (services read current_app.config)."""
+    def wrapper(*args, **kwargs):
+        with app.app_context():
+            return func(*args, **kwargs)
+    return wrapper
+
+def submit_with_app_context(func, *args, **kwargs):
+    """Submit func to the shared analysis executor with the current app context."""
+    app = current_app._get_current_object()
+    return ANALYSIS_EXECUTOR.submit(with_app_context(app, func), *args, **kwargs)
+
+def get_cpu_pool() -> LazyProcessPool:
+    """The shared process pool for CPU-bound services (see LazyProcessPool)."""
+    return _cpu_pool
+
+def get_pdf_pool() -> LazyProcessPool:
+    """The process pool used for parallel PDF page extraction."""
+    return _pdf_pool
+
+def submit_cpu_bound(func, *args, **kwargs):
+    """
+    Submit a CPU-bound function that needs no app context. func and its arguments
+    must be picklable (module-level) when ANALYSIS_CPU_BOUND is enabled.
+    """
+    if ANALYSIS_CPU_BOUND:
+        return _cpu_pool.submit(func, *args, **kwargs)
+    return ANALYSIS_EXECUTOR.submit(func, *args, **kwargs)
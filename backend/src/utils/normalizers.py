@@ -3,10 +3,20 @@ Normalization utilities for service outputs.
 Ensures consistent data structures and graceful fallbacks.
 """
 import logging
-from typing import Dict, List, Any, Union
+from typing import Dict, List, Any, Tuple, Union
+
+from src.services.factcheck_service import extract_claims, fact_check_claims
 
 logger = logging.getLogger(__name__)
 
+# Raw fact-check statuses -> display status; anything else is "Unverified"
+_FACTCHECK_STATUS = {
+    "verified": "Verified",
+    "true": "Verified",
+    "contradicted": "Contradicted",
+    "false": "Contradicted",
+}
+
 def normalize_plagiarism_result(result: Any) -> Dict[str, Any]:
     """
     Normalize plagiarism service output to consistent format.
@@ -120,14 +130,9 @@ def normalize_factcheck_result(result: Any) -> List[Dict[str, str]]:
                     
                     # Normalize status
                     status = item.get("status", "no_verdict")
-                    if status in ["verified", "true"]:
-                        normalized_status = "Verified"
-                    elif status in ["contradicted", "false"]:
-                        normalized_status = "Contradicted"
-                    elif status in ["api_error", "error"]:
-                        normalized_status = "Unverified"
-                    else:
-                        normalized_status = "Unverified"
+                    normalized_status = (
+                        _FACTCHECK_STATUS.get(status, "Unverified") if isinstance(status, str) else "Unverified"
+                    )
                     
                     normalized.append({
                         "claim": claim,
@@ -167,4 +172,20 @@ def safe_call_service(service_func, *args, **kwargs) -> Any:
         elif 'fact' in func_name.lower():
             return [{"claim": "Service unavailable", "status": "Unverified"}]
         else:
-            return None
\ No newline at end of file
+            return None
+def run_fact_check(text: str) -> Tuple[List[Dict[str, str]], bool]:
+    """
+    Extract claims from text and fact-check them.
+    Returns (facts normalized like normalize_factcheck_result, ok); ok is False when the
+    fact-check service failed or any claim came back "api_error", so the result is degraded.
+    """
+    claims = extract_claims(text)
+    if not claims:
+        return [], True
+    try:
+        fact_check_raw = fact_check_claims(claims)
+    except Exception as e:
+        logger.error(f"Service call failed: fact_check_claims: {e}")
+        return [{"claim": "Service unavailable", "status": "Unverified"}], False
+    ok = not any(isinstance(r, dict) and r.get("status") == "api_error" for r in fact_check_raw or [])
+    return normalize_factcheck_result(fact_check_raw), ok
@@ -0,0 +1,9 @@
+"""
+Fast JSON responses for large analysis payloads.
+"""
+import orjson
+from flask import Response
+
+def json_response(obj, status: int = 200) -> Response:
+    """Serialize obj with orjson (C implementation) instead of Flask's jsonify."""
+    return Response(orjson.dumps(obj), status=status, mimetype="application/json")
@@ -0,0 +1,13 @@
+"""
+Small text helpers shared by the analysis services.
+"""
+import re
+from typing import List
+
+# Word tokens: ASCII letters, digits and apostrophes
+TOKEN_PATTERN = r"[A-Za-z0-9']+"
+_TOKEN_RE = re.compile(TOKEN_PATTERN)
+
+def tokenize(s: str) -> List[str]:
+    """Lowercase s and split it into word tokens."""
+    return _TOKEN_RE.findall(s.lower())